@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Admission control helpers shared by the Flask backend and the enhanced server
+Provides per-client token-bucket rate limiting and bounded concurrency budgets
+so heavy uploads cannot starve cheap gallery reads
+"""
+
+import threading
+import time
+from typing import Dict, List, Tuple
+
+# Buckets idle for this long are full again and can be forgotten
+BUCKET_IDLE_SECONDS = 600
+PRUNE_INTERVAL_SECONDS = 60
+
+
+class TokenBucketLimiter:
+    """Per-client token bucket: `rate` tokens per second, up to `burst` tokens"""
+
+    def __init__(self, rate: float, burst: int) -> None:
+        self.rate = rate
+        self.burst = burst
+        self._buckets: Dict[str, List[float]] = {}  # key -> [tokens, last_refill]
+        self._lock = threading.Lock()
+        self._last_prune = time.monotonic()
+
+    def allow(self, key: str, cost: float = 1.0) -> Tuple[bool, float]:
+        """Take `cost` tokens for `key`. Returns (allowed, seconds until retry)"""
+        now = time.monotonic()
+        with self._lock:
+            self._prune(now)
+
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = [float(self.burst), now]
+
+            # Refill tokens for the time elapsed since the last request
+            tokens = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+            bucket[1] = now
+
+            if tokens >= cost:
+                bucket[0] = tokens - cost
+                return True, 0.0
+
+            bucket[0] = tokens
+            return False, (cost - tokens) / self.rate
+
+    def _prune(self, now: float) -> None:
+        """Drop idle buckets so the table does not grow with every client seen"""
+        if now - self._last_prune < PRUNE_INTERVAL_SECONDS:
+            return
+        self._last_prune = now
+        stale = [key for key, (_, last) in self._buckets.items() if now - last > BUCKET_IDLE_SECONDS]
+        for key in stale:
+            del self._buckets[key]
+
+
+class ConcurrencyBudget:
+    """Bounded number of in-flight requests; over-budget callers are rejected, not queued"""
+
+    def __init__(self, name: str, limit: int) -> None:
+        self.name = name
+        self.limit = limit
+        self._semaphore = threading.BoundedSemaphore(limit)
+
+    def try_acquire(self) -> bool:
+        return self._semaphore.acquire(blocking=False)
+
+    def release(self) -> None:
+        self._semaphore.release()
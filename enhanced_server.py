@@ -5,55 +5,130 @@ Run this instead of the basic Python HTTP server
 """
 
 import json
+import math
 import os
-from http.server import HTTPServer, SimpleHTTPRequestHandler
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
 from typing import Any
+from admission_control import TokenBucketLimiter, ConcurrencyBudget
+from static_publish import PublishScheduler, published_path, write_atomic, PUBLISHED_PAGES
+
+# Admission control
+MAX_CONTENT_BYTES = 50 * 1024 * 1024  # Largest accepted content update
+UPDATE_CONCURRENCY = 1                # Each update reads, edits and rewrites content.json; one at a time so none is lost
+UPDATE_RATE, UPDATE_BURST = 0.2, 5    # Content updates per second per client IP
+SOCKET_TIMEOUT_SECONDS = 30           # A stalled client read fails after this long
+
+update_budget = ConcurrencyBudget('update', UPDATE_CONCURRENCY)
+update_limiter = TokenBucketLimiter(UPDATE_RATE, UPDATE_BURST)
+
+def load_content_snapshot() -> dict[str, Any]:
+    """Snapshot of the public content in content.json for the static pages"""
+    with open('data/content.json', 'r', encoding='utf-8') as f:
+        content = json.load(f)
+    return {
+        'galleryAlbums': content.get('galleryAlbums', []),
+        'homeSlides': content.get('homeSlides', [])
+    }
+
+# Re-render the static pages shortly after any content update
+publisher = PublishScheduler(load_content_snapshot)
 
 class ContentUpdateHandler(SimpleHTTPRequestHandler):
+    # StreamRequestHandler applies this to the socket, so a client that stops
+    # sending mid-body raises instead of holding the thread and update slot
+    timeout = SOCKET_TIMEOUT_SECONDS
+
+    def translate_path(self, path: str) -> str:
+        # Serve the pre-rendered home and gallery pages when they exist
+        page = path.split('?', 1)[0].split('#', 1)[0].lstrip('/') or 'index.html'
+        published = published_path(page)
+        if published:
+            return published
+        # The shell changed since the last publish: serve it and re-publish
+        if page in PUBLISHED_PAGES and os.path.exists('data/content.json'):
+            publisher.schedule()
+        return super().translate_path(path)
+
     def do_POST(self):
         if self.path == '/api/update-content':
+            # Reject oversized or over-limit updates before reading the body;
+            # the socket timeout bounds how long a slow upload can hold the slot
             try:
-                # Get content length
                 content_length = int(self.headers['Content-Length'])
+            except (TypeError, ValueError):
+                self.send_error(411, "Content-Length required")
+                return
+            if content_length < 0:
+                self.send_error(400, "Invalid Content-Length")
+                return
+            if content_length > MAX_CONTENT_BYTES:
+                self.send_error(413, f"Request body exceeds {MAX_CONTENT_BYTES // (1024 * 1024)} MB limit")
+                return
+
+            allowed, retry_after = update_limiter.allow(self.client_address[0])
+            if not allowed:
+                self.send_too_many_requests("Rate limit exceeded, please slow down", retry_after)
+                return
+            if not update_budget.try_acquire():
+                self.send_too_many_requests("Server busy, please retry shortly")
+                return
+
+            try:
+                self.update_content(content_length)
+            finally:
+                update_budget.release()
+        else:
+            self.send_error(404, "API endpoint not found")
+
+    def send_too_many_requests(self, message: str, retry_after: float = 1.0) -> None:
+        # The unread request body is left on the socket, so drop the connection
+        self.close_connection = True
+        self.send_response(429, message)
+        self.send_header('Retry-After', str(max(1, math.ceil(retry_after))))
+        self.send_header('Content-type', 'application/json')
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.send_header('Connection', 'close')
+        self.end_headers()
+        self.wfile.write(json.dumps({"success": False, "message": message}).encode())
+
+    def update_content(self, content_length: int) -> None:
+        try:
+            # Read POST data
+            post_data = self.rfile.read(content_length)
+            
+            # Parse JSON data
+            data = json.loads(post_data.decode('utf-8'))
+            
+            # Load existing content.json
+            content_file = 'data/content.json'
+            if os.path.exists(content_file):
+                with open(content_file, 'r', encoding='utf-8') as f:
+                    content = json.load(f)
+            else:
+                content = {"siteInfo": {"name": "Our Lady of Lourdes Shrine"}}
+            
+            # Update specific key
+            if 'key' in data and 'data' in data:
+                content[data['key']] = data['data']
                 
-                # Read POST data
-                post_data = self.rfile.read(content_length)
+                # Write back to content.json atomically so the publisher never reads a partial file
+                write_atomic(content_file, json.dumps(content, indent=2, ensure_ascii=False))
+                publisher.schedule()
                 
-                # Parse JSON data
-                data = json.loads(post_data.decode('utf-8'))
+                # Send success response
+                self.send_response(200)
+                self.send_header('Content-type', 'application/json')
+                self.send_header('Access-Control-Allow-Origin', '*')
+                self.end_headers()
                 
-                # Load existing content.json
-                content_file = 'data/content.json'
-                if os.path.exists(content_file):
-                    with open(content_file, 'r', encoding='utf-8') as f:
-                        content = json.load(f)
-                else:
-                    content = {"siteInfo": {"name": "Our Lady of Lourdes Shrine"}}
+                response: dict[str, Any] = {"success": True, "message": "Content updated successfully"}
+                self.wfile.write(json.dumps(response).encode())
+            else:
+                self.send_error(400, "Invalid data format")
                 
-                # Update specific key
-                if 'key' in data and 'data' in data:
-                    content[data['key']] = data['data']
-                    
-                    # Write back to content.json
-                    with open(content_file, 'w', encoding='utf-8') as f:
-                        json.dump(content, f, indent=2, ensure_ascii=False)
-                    
-                    # Send success response
-                    self.send_response(200)
-                    self.send_header('Content-type', 'application/json')
-                    self.send_header('Access-Control-Allow-Origin', '*')
-                    self.end_headers()
-                    
-                    response: dict[str, Any] = {"success": True, "message": "Content updated successfully"}
-                    self.wfile.write(json.dumps(response).encode())
-                else:
-                    self.send_error(400, "Invalid data format")
-                    
-            except Exception as e:
-                self.send_error(500, f"Server error: {str(e)}")
-        else:
-            self.send_error(404, "API endpoint not found")
-    
+        except Exception as e:
+            self.send_error(500, f"Server error: {str(e)}")
+
     def do_OPTIONS(self):
         # Handle CORS preflight requests
         self.send_response(200)
@@ -64,7 +139,9 @@ class ContentUpdateHandler(SimpleHTTPRequestHandler):
 
 def run_server(port: int = 8000) -> None:
     server_address = ('', port)
-    httpd = HTTPServer(server_address, ContentUpdateHandler)
+    httpd = ThreadingHTTPServer(server_address, ContentUpdateHandler)
+    if os.path.exists('data/content.json'):
+        publisher.publish_now()
     print(f"🚀 Enhanced server running at http://localhost:{port}")
     print("📁 Serving files from current directory")
     print("🔄 API endpoint available at /api/update-content")
@@ -4,13 +4,18 @@ Flask Backend Server for Our Lady of Lourdes Shrine Website
 Handles image uploads, storage, and serves data to clients
 """
 
-from flask import Flask, request, jsonify, send_from_directory
+from flask import Flask, request, jsonify, send_from_directory, g
 from flask_cors import CORS
+from werkzeug.exceptions import HTTPException
+from werkzeug.middleware.proxy_fix import ProxyFix
+import math
 import os
 import base64
 import uuid
 import sqlite3
 from typing import Optional
+from admission_control import TokenBucketLimiter, ConcurrencyBudget
+from static_publish import PublishScheduler, published_path, PUBLISH_DIR, PUBLISHED_PAGES
 
 # Initialize Flask app
 app = Flask(__name__)
@@ -23,6 +28,37 @@ UPLOAD_FOLDER = os.path.join(BASE_DIR, 'uploads')
 DATABASE = os.path.join(BASE_DIR, 'shrine_data.db')
 ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif', 'webp'}
 
+# Admission control
+# Limits are per worker process; run gunicorn with threads (gthread) so the
+# concurrency budgets have something to bound
+MAX_UPLOAD_BYTES = 50 * 1024 * 1024  # Largest accepted request body (base64 inflates images ~33%)
+HEAVY_ENDPOINTS = {
+    'create_gallery_album',
+    'add_images_to_album',
+    'create_slideshow_slide',
+    'delete_slideshow_slide',
+    'delete_gallery_album',
+    'migrate_from_localstorage',
+}
+HEAVY_CONCURRENCY = 2   # Simultaneous uploads/migrations per worker
+READ_CONCURRENCY = 32   # Simultaneous reads per worker
+HEAVY_RATE, HEAVY_BURST = 0.2, 5   # Writes per second per client IP
+API_READ_RATE, API_READ_BURST = 10.0, 40  # /api reads per second per client IP
+
+app.config['MAX_CONTENT_LENGTH'] = MAX_UPLOAD_BYTES
+
+# Rate limits key on the client IP. Behind a reverse proxy every request comes
+# from the proxy's address, so set this to the number of trusted proxies in
+# front of the app to take the client IP from X-Forwarded-For instead
+TRUSTED_PROXY_HOPS = 0
+if TRUSTED_PROXY_HOPS:
+    app.wsgi_app = ProxyFix(app.wsgi_app, x_for=TRUSTED_PROXY_HOPS)
+
+heavy_budget = ConcurrencyBudget('heavy', HEAVY_CONCURRENCY)
+read_budget = ConcurrencyBudget('read', READ_CONCURRENCY)
+heavy_limiter = TokenBucketLimiter(HEAVY_RATE, HEAVY_BURST)
+api_read_limiter = TokenBucketLimiter(API_READ_RATE, API_READ_BURST)
+
 # Create necessary directories
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 os.makedirs(os.path.join(BASE_DIR, 'data'), exist_ok=True)
@@ -104,17 +140,147 @@ def save_base64_image(base64_data: str, filename_prefix: str = "image") -> Optio
         print(f"Error saving base64 image: {e}")
         return None
 
+def fetch_gallery_albums(conn) -> list:
+    """Load all gallery albums with their images"""
+    albums = conn.execute('SELECT * FROM gallery_albums ORDER BY created_at DESC').fetchall()
+    
+    result = []
+    for album in albums:
+        # Get images for this album
+        images = conn.execute('''
+            SELECT id, filename, original_name, upload_date 
+            FROM gallery_images 
+            WHERE album_id = ? 
+            ORDER BY upload_date DESC
+        ''', (album['id'],)).fetchall()
+        
+        album_data = {
+            'id': album['id'],
+            'name': album['name'],
+            'description': album['description'],
+            'createdAt': album['created_at'],
+            'images': [
+                {
+                    'id': img['id'],
+                    'src': f'/uploads/{img["filename"]}',
+                    'name': img['original_name'],
+                    'uploadDate': img['upload_date']
+                }
+                for img in images
+            ]
+        }
+        result.append(album_data)
+    
+    return result
+
+def fetch_slideshow_slides(conn) -> list:
+    """Load all slideshow slides in display order"""
+    slides = conn.execute('''
+        SELECT * FROM slideshow_slides 
+        ORDER BY order_index ASC, created_at DESC
+    ''').fetchall()
+    
+    return [
+        {
+            'id': slide['id'],
+            'title': slide['title'],
+            'description': slide['description'],
+            'image': f'/uploads/{slide["filename"]}',
+            'buttonText': slide['button_text'],
+            'buttonLink': slide['button_link'],
+            'createdAt': slide['created_at']
+        }
+        for slide in slides
+    ]
+
+def load_content_snapshot() -> dict:
+    """Snapshot of the public content rendered into the static pages"""
+    conn = get_db_connection()
+    try:
+        return {
+            'galleryAlbums': fetch_gallery_albums(conn),
+            'homeSlides': fetch_slideshow_slides(conn)
+        }
+    finally:
+        conn.close()
+
+# Re-render the static pages shortly after any write
+publisher = PublishScheduler(load_content_snapshot)
+
+def payload_too_large():
+    return jsonify({'error': f'Request body exceeds {MAX_UPLOAD_BYTES // (1024 * 1024)} MB limit'}), 413
+
+def too_many_requests(message: str, retry_after: float = 1.0):
+    response = jsonify({'error': message})
+    response.status_code = 429
+    response.headers['Retry-After'] = str(max(1, math.ceil(retry_after)))
+    return response
+
+# Admission Control
+
+@app.before_request
+def admit_request():
+    """Reject over-limit requests before any body is read or worker time is spent"""
+    if request.method == 'OPTIONS':
+        return None
+
+    # Trust the declared length only to reject early; Flask still enforces
+    # MAX_CONTENT_LENGTH while reading bodies without one
+    if request.content_length is not None and request.content_length > MAX_UPLOAD_BYTES:
+        return payload_too_large()
+
+    client = request.remote_addr or 'unknown'
+    heavy = request.endpoint in HEAVY_ENDPOINTS
+
+    if heavy:
+        allowed, retry_after = heavy_limiter.allow(client)
+    elif request.path.startswith('/api/'):
+        allowed, retry_after = api_read_limiter.allow(client)
+    else:
+        allowed, retry_after = True, 0.0
+    if not allowed:
+        return too_many_requests('Rate limit exceeded, please slow down', retry_after)
+
+    budget = heavy_budget if heavy else read_budget
+    if not budget.try_acquire():
+        return too_many_requests(f'Server busy ({budget.name} requests), please retry shortly')
+    g.admission_budget = budget
+    return None
+
+@app.teardown_request
+def release_admission(exc: Optional[BaseException] = None) -> None:
+    """Return the concurrency slot taken in admit_request"""
+    budget = g.pop('admission_budget', None)
+    if budget is not None:
+        budget.release()
+
+@app.after_request
+def publish_after_write(response):
+    """Every heavy endpoint is a write; re-publish the static pages once it succeeds"""
+    if request.endpoint in HEAVY_ENDPOINTS and response.status_code == 200:
+        publisher.schedule()
+    return response
+
+@app.errorhandler(413)
+def request_too_large(e):
+    return payload_too_large()
+
 # API Routes
 
 @app.route('/')
 def home():
     """Serve the main website"""
-    # Serve index.html from the package directory (BASE_DIR)
-    return send_from_directory(BASE_DIR, 'index.html')
+    return serve_static('index.html')
 
 @app.route('/<path:filename>')
 def serve_static(filename: str):
     """Serve static files"""
+    # Prefer the pre-rendered copy of the home and gallery pages
+    if filename in PUBLISHED_PAGES:
+        if published_path(filename):
+            return send_from_directory(PUBLISH_DIR, filename)
+        # Never published in this deployment or the shell changed since: serve the shell and re-publish
+        publisher.schedule()
     # Serve other static files (css/js/html) from the package directory
     return send_from_directory(BASE_DIR, filename)
 
@@ -128,37 +294,7 @@ def get_gallery_albums():
     """Get all gallery albums with their images"""
     try:
         conn = get_db_connection()
-        
-        # Get all albums
-        albums = conn.execute('SELECT * FROM gallery_albums ORDER BY created_at DESC').fetchall()
-        
-        result = []
-        for album in albums:
-            # Get images for this album
-            images = conn.execute('''
-                SELECT id, filename, original_name, upload_date 
-                FROM gallery_images 
-                WHERE album_id = ? 
-                ORDER BY upload_date DESC
-            ''', (album['id'],)).fetchall()
-            
-            album_data = {
-                'id': album['id'],
-                'name': album['name'],
-                'description': album['description'],
-                'createdAt': album['created_at'],
-                'images': [
-                    {
-                        'id': img['id'],
-                        'src': f'/uploads/{img["filename"]}',
-                        'name': img['original_name'],
-                        'uploadDate': img['upload_date']
-                    }
-                    for img in images
-                ]
-            }
-            result.append(album_data)
-        
+        result = fetch_gallery_albums(conn)
         conn.close()
         return jsonify(result)
         
@@ -186,6 +322,8 @@ def create_gallery_album():
             'album_id': album_id
         })
         
+    except HTTPException:
+        raise  # e.g. 413 from MAX_CONTENT_LENGTH on a chunked body
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -216,6 +354,8 @@ def add_images_to_album(album_id: str):
             'message': f'{len(images_data)} images added successfully'
         })
         
+    except HTTPException:
+        raise  # e.g. 413 from MAX_CONTENT_LENGTH on a chunked body
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -224,23 +364,7 @@ def get_slideshow_slides():
     """Get all slideshow slides"""
     try:
         conn = get_db_connection()
-        slides = conn.execute('''
-            SELECT * FROM slideshow_slides 
-            ORDER BY order_index ASC, created_at DESC
-        ''').fetchall()
-        
-        result = [
-            {
-                'id': slide['id'],
-                'title': slide['title'],
-                'description': slide['description'],
-                'image': f'/uploads/{slide["filename"]}',
-                'buttonText': slide['button_text'],
-                'buttonLink': slide['button_link'],
-                'createdAt': slide['created_at']
-            }
-            for slide in slides
-        ]
+        result = fetch_slideshow_slides(conn)
         
         conn.close()
         return jsonify(result)
@@ -284,6 +408,8 @@ def create_slideshow_slide():
             'slide_id': slide_id
         })
         
+    except HTTPException:
+        raise  # e.g. 413 from MAX_CONTENT_LENGTH on a chunked body
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -424,12 +550,15 @@ def migrate_from_localstorage():
             'message': f'Successfully migrated {migrated_count} items to backend database'
         })
         
+    except HTTPException:
+        raise  # e.g. 413 from MAX_CONTENT_LENGTH on a chunked body
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 if __name__ == '__main__':
     print("🚀 Initializing Our Lady of Lourdes Shrine Backend...")
     init_database()
+    publisher.publish_now()
     
     print("✅ Flask backend server ready!")
     print("📊 Features available:")
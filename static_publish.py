@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+Static pre-render of the home slideshow and gallery pages
+Renders slides and albums into the HTML shells with an embedded JSON snapshot,
+so a normal page view is a single static file with no API round trip
+"""
+
+import html
+import json
+import os
+import tempfile
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+PUBLISH_DIR = os.path.join(BASE_DIR, 'published')
+PUBLISHED_PAGES = ('index.html', 'gallery.html')
+
+PUBLISH_DEBOUNCE_SECONDS = 2.0   # Quiet period after the last write before publishing
+PUBLISH_MAX_DELAY_SECONDS = 10.0  # Publish at least this often during a burst of writes
+
+# Placeholders in the HTML shells that the rendered markup replaces
+SLIDES_MARKER = '<!-- Slides will be loaded dynamically from admin panel -->'
+INDICATORS_MARKER = '<!-- Indicators will be loaded dynamically -->'
+ALBUMS_MARKER = '<!-- Albums will be loaded dynamically from admin panel -->'
+SCRIPT_MARKER = '<script src="js/script.js"></script>'
+
+Snapshot = Dict[str, List[Dict[str, Any]]]
+
+
+def esc(value: Any) -> str:
+    return html.escape(str(value or ''), quote=True)
+
+
+def render_slides(slides: List[Dict[str, Any]]) -> str:
+    """Render slideshow slides; the first slide is shown before any JS runs"""
+    parts = []
+    for i, slide in enumerate(slides):
+        button = ''
+        if slide.get('buttonText'):
+            button = f'<a href="{esc(slide.get("buttonLink") or "#")}" class="slide-btn">{esc(slide["buttonText"])}</a>'
+        parts.append(f'''
+                <div class="slide{' active' if i == 0 else ''}" data-slide-id="{esc(slide.get('id'))}">
+                    <img src="{esc(slide.get('image'))}" alt="{esc(slide.get('title'))}"{'' if i == 0 else ' loading="lazy"'}>
+                    <div class="slide-content">
+                        <h2>{esc(slide.get('title'))}</h2>
+                        <p>{esc(slide.get('description'))}</p>
+                        {button}
+                    </div>
+                </div>''')
+    return ''.join(parts)
+
+
+def render_indicators(slides: List[Dict[str, Any]]) -> str:
+    return ''.join(
+        f'\n                <span class="indicator{" active" if i == 0 else ""}" data-slide="{i}"></span>'
+        for i in range(len(slides))
+    )
+
+
+def render_albums(albums: List[Dict[str, Any]]) -> str:
+    """Render album cards with the same markup as renderAlbums() in gallery.html"""
+    if not albums:
+        return '''
+                        <div class="no-albums-public">
+                            <i class="fas fa-images"></i>
+                            <h3>No Photo Albums Yet</h3>
+                            <p>Photo albums will appear here once they are created by the admin.</p>
+                        </div>'''
+
+    # The id goes in a data attribute, never into the onclick JS string
+    parts = []
+    for album in albums:
+        description = f'<p class="album-desc">{esc(album["description"])}</p>' if album.get('description') else ''
+        parts.append(f'''
+                        <div class="public-album-card text-only" data-album-id="{esc(album.get('id'))}" onclick="viewPublicAlbum(this.dataset.albumId)">
+                            <div class="album-content">
+                                <div class="album-icon">
+                                    <i class="fas fa-images"></i>
+                                </div>
+                                <div class="album-info">
+                                    <h3>{esc(album.get('name'))}</h3>
+                                    <p>{len(album.get('images', []))} photos</p>
+                                    {description}
+                                </div>
+                            </div>
+                        </div>''')
+    return ''.join(parts)
+
+
+# Which part of the snapshot each page embeds, and the image field of its entries
+PAGE_CONTENT = {
+    'index.html': ('homeSlides', 'image'),
+    'gallery.html': ('galleryAlbums', None),
+}
+
+
+def strip_inline_images(entry: Dict[str, Any], field: str) -> Dict[str, Any]:
+    """Drop an inline data: image from an entry; the page markup or a fetch supplies it"""
+    if str(entry.get(field) or '').startswith('data:'):
+        entry = dict(entry)
+        del entry[field]
+    return entry
+
+
+def page_snapshot(page: str, snapshot: Snapshot) -> Snapshot:
+    """The part of the snapshot `page` uses, without inline base64 images"""
+    key, field = PAGE_CONTENT[page]
+    entries = snapshot.get(key, [])
+    if field:
+        entries = [strip_inline_images(entry, field) for entry in entries]
+    else:
+        entries = [
+            dict(album, images=[strip_inline_images(img, 'src') for img in album.get('images', [])])
+            for album in entries
+        ]
+    return {key: entries}
+
+
+def render_snapshot(snapshot: Snapshot) -> str:
+    """Embed the snapshot as inert JSON; <, > and & are \\u-escaped so no text can end or reopen the script"""
+    data = (json.dumps(snapshot, ensure_ascii=False)
+            .replace('<', '\\u003c').replace('>', '\\u003e').replace('&', '\\u0026'))
+    return f'<script id="contentSnapshot" type="application/json">{data}</script>\n    '
+
+
+def render_page(page: str, snapshot: Snapshot) -> str:
+    with open(os.path.join(BASE_DIR, page), 'r', encoding='utf-8') as f:
+        markup = f.read()
+
+    slides = snapshot.get('homeSlides', [])
+    if page == 'index.html' and slides:
+        markup = markup.replace(SLIDES_MARKER, render_slides(slides), 1)
+        markup = markup.replace(INDICATORS_MARKER, render_indicators(slides), 1)
+    elif page == 'gallery.html':
+        markup = markup.replace(ALBUMS_MARKER, render_albums(snapshot.get('galleryAlbums', [])), 1)
+
+    return markup.replace(SCRIPT_MARKER, render_snapshot(page_snapshot(page, snapshot)) + SCRIPT_MARKER, 1)
+
+
+def write_atomic(path: str, data: str) -> None:
+    """Write to a temp file in the same directory and rename it over the target"""
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.tmp_', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8', newline='') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        # mkstemp creates the file 0600; make it readable by the front web server
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def publish(snapshot: Snapshot) -> None:
+    """Render every published page from `snapshot` into PUBLISH_DIR"""
+    os.makedirs(PUBLISH_DIR, exist_ok=True)
+    for page in PUBLISHED_PAGES:
+        write_atomic(os.path.join(PUBLISH_DIR, page), render_page(page, snapshot))
+
+
+def published_path(page: str) -> Optional[str]:
+    """Path of the pre-rendered copy of `page`, if one is published and newer than its shell"""
+    if page not in PUBLISHED_PAGES:
+        return None
+    path = os.path.join(PUBLISH_DIR, page)
+    try:
+        if os.path.getmtime(path) >= os.path.getmtime(os.path.join(BASE_DIR, page)):
+            return path
+    except OSError:
+        pass  # Not published yet
+    return None
+
+
+class PublishScheduler:
+    """Debounces publish requests so a burst of writes renders the pages once"""
+
+    def __init__(self, load_snapshot: Callable[[], Snapshot],
+                 delay: float = PUBLISH_DEBOUNCE_SECONDS,
+                 max_delay: float = PUBLISH_MAX_DELAY_SECONDS) -> None:
+        self.load_snapshot = load_snapshot
+        self.delay = delay
+        self.max_delay = max_delay
+        self._timer: Optional[threading.Timer] = None
+        self._first_request = 0.0
+        self._lock = threading.Lock()
+        self._publish_lock = threading.Lock()
+
+    def schedule(self) -> None:
+        now = time.monotonic()
+        with self._lock:
+            if self._timer is not None:
+                # Keep the pending publish once writes have deferred it long enough
+                if now - self._first_request >= self.max_delay:
+                    return
+                self._timer.cancel()
+            else:
+                self._first_request = now
+            self._timer = threading.Timer(self.delay, self.publish_now)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def publish_now(self) -> None:
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        with self._publish_lock:
+            try:
+                publish(self.load_snapshot())
+                print("✅ Static pages published")
+            except Exception as e:
+                print(f"Error publishing static pages: {e}")